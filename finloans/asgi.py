@@ -3,6 +3,12 @@ ASGI config for finloans project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The loan event stream (/loans/events/) only works through this entry point;
+under WSGI it answers 501. Serve it with an ASGI server, e.g.::
+
+    pip install uvicorn
+    uvicorn finloans.asgi:application --workers 4
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
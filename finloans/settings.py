@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -47,6 +48,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'loans.throttling.LoadSheddingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -83,11 +85,40 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Rate limits need a cache shared by every worker, with atomic incr(), and
+# the loan page cache keeps its version tokens here, so a save in one worker
+# only invalidates other workers' pages when they share this cache. Set
+# REDIS_URL in any deployment with more than one process; the local-memory
+# fallback only suits a single-process development server, and
+# `manage.py check --deploy` warns about it (loans.W001).
+
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
 AUTH_USER_MODEL = 'loans.CustomUser'
 
+# Loads the session user together with its role profile; see loans.backends.
+AUTHENTICATION_BACKENDS = ['loans.backends.ProfileModelBackend']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -122,6 +153,47 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# Loan event streaming
+# InProcessBroker serves a single ASGI process; use loans.events.CacheBroker
+# with a shared CACHES backend when running several workers.
+
+LOAN_EVENTS_BROKER = 'loans.events.InProcessBroker'
+
+# Rate limiting and load shedding
+# Requests allowed per window and scope, counted per user and per client IP.
+# See loans.throttling for the defaults.
+
+LOANS_RATE_LIMITS = {
+    'apply_loan': '30/min',
+    'make_payment': '30/min',
+    'approve_loan': '60/min',
+    'api_write': '120/min',
+}
+
+# Behind a reverse proxy every request shares the proxy's REMOTE_ADDR. Name
+# the header the proxy sets and how many trusted proxies append to it.
+
+LOANS_CLIENT_IP_HEADER = None  # e.g. 'HTTP_X_FORWARDED_FOR'
+LOANS_NUM_PROXIES = 1
+
+# MAX_IN_FLIGHT counts requests running in this process. Under a threaded
+# WSGI server that never exceeds the thread count, so keep it below that or
+# rely on MAX_DB_LATENCY_MS; requests queued for a thread are not counted.
+
+LOANS_LOAD_SHEDDING = {
+    'MAX_IN_FLIGHT': 64,
+    'MAX_DB_LATENCY_MS': 250,
+    'EXEMPT': ['approve_loan'],
+}
+
+# Admin changelists above this many rows show an estimated total instead of COUNT(*).
+
+LOANS_ADMIN_COUNT_THRESHOLD = 100_000
+
+REST_FRAMEWORK = {
+    'DEFAULT_THROTTLE_CLASSES': ['loans.throttling.RateLimitThrottle'],
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
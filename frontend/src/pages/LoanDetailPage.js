@@ -7,7 +7,7 @@ import {
   TableRow
 } from '@mui/material';
 import { useNavigate, useParams } from 'react-router-dom';
-import { loanService } from '../services/api';
+import { loanService, loanEventsService } from '../services/api';
 import { useAuth } from '../contexts/AuthContext';
 import { 
   CheckCircle as CheckCircleIcon,
@@ -42,6 +42,16 @@ const LoanDetailPage = () => {
     }
   }, [loanId]);
 
+  // Refresh when the server pushes an approval or payment for this loan
+  useEffect(() => {
+    const refresh = () => loanService.getLoanById(loanId).then((response) => setLoan(response.data));
+    return loanEventsService.subscribe((event) => {
+      if (String(event.loan) === String(loanId)) {
+        refresh();
+      }
+    }, refresh);
+  }, [loanId]);
+
   // Go back to loans list
   const handleGoBack = () => {
     navigate('/my-loans');
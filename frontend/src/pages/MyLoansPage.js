@@ -5,7 +5,7 @@ import {
   MenuItem, Select, FormControl, InputLabel, Tabs, Tab 
 } from '@mui/material';
 import { Search as SearchIcon, FilterList as FilterIcon } from '@mui/icons-material';
-import { loanService } from '../services/api';
+import { loanService, loanEventsService } from '../services/api';
 import { useAuth } from '../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import LoanCard from '../components/LoanCard';
@@ -50,6 +50,26 @@ const MyLoansPage = () => {
     fetchLoans();
   }, [currentUser]);
 
+  // Mark loans approved as soon as the server pushes the event
+  useEffect(() => {
+    const markApproved = (isApproved) => {
+      const update = (list) => list.map(loan => (
+        isApproved(loan) ? { ...loan, approved: true } : loan
+      ));
+      setLoans(update);
+      setFilteredLoans(update);
+    };
+    // Without the stream, re-fetch periodically and pick up new approvals
+    const refresh = () => loanService.getLoans().then((response) => {
+      const approved = new Set(response.data.filter(loan => loan.approved).map(loan => loan.id));
+      markApproved(loan => approved.has(loan.id));
+    });
+    return loanEventsService.subscribe((event) => {
+      if (event.type !== 'loan.approved') return;
+      markApproved(loan => loan.id === event.loan);
+    }, refresh);
+  }, []);
+
   // Handle tab change
   const handleTabChange = (event, newValue) => {
     setTabValue(newValue);
@@ -46,4 +46,29 @@ export const loanParametersService = {
   defineParameters: (data) => api.post('/loans/define-loan-parameters/', data),
 };
 
+// Loan event stream (server-sent events)
+// EventSource cannot send the Authorization header, so the stream relies on
+// the Django session cookie: the app must be served from the API's origin (or
+// with CORS allowing credentials) and through the ASGI server. When the stream
+// is refused or drops, fall back to calling onUnavailable every pollInterval ms.
+export const loanEventsService = {
+  subscribe: (onEvent, onUnavailable, pollInterval = 30000) => {
+    const source = new EventSource(`${API_URL}/loans/events/`, { withCredentials: true });
+    let poller = null;
+    ['loan.approved', 'payment.recorded'].forEach((type) => {
+      source.addEventListener(type, (message) => onEvent(JSON.parse(message.data)));
+    });
+    source.onerror = () => {
+      source.close();
+      if (onUnavailable && !poller) {
+        poller = setInterval(onUnavailable, pollInterval);
+      }
+    };
+    return () => {
+      source.close();
+      clearInterval(poller);
+    };
+  },
+};
+
 export default api;
\ No newline at end of file
@@ -1,17 +1,69 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Loan, LoanProvider, LoanCustomer, BankPersonnel
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+from .models import CustomUser, Loan, LoanProvider, LoanCustomer, BankPersonnel, Payment
+from .search import search_loans
 
 # Register your models here.
 
+def estimate_row_count(model):
+    """Planner row estimate on PostgreSQL; None where no cheap estimate exists."""
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+        row = cursor.fetchone()
+    if row and row[0] >= 0:
+        return row[0]
+    return None
+
+class EstimatedCountPaginator(Paginator):
+    """Skips the exact COUNT(*) of unfiltered changelists once the table is large.
+
+    Only databases with planner statistics (PostgreSQL's ``reltuples``) are
+    estimated; elsewhere, and for filtered or searched changelists, the count
+    is exact. The threshold is ``LOANS_ADMIN_COUNT_THRESHOLD``.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model)
+            if estimate is not None and estimate > getattr(settings, 'LOANS_ADMIN_COUNT_THRESHOLD', 100_000):
+                return estimate
+        return super().count
+
 class CustomUserAdmin(UserAdmin):
     ('Role', {'fields': ('role',)}),
 
 class LoanAdmin(admin.ModelAdmin):
     list_display = ('id', 'provider', 'customer', 'amount', 'interest_rate', 'start_date', 'end_date', 'approved')
-    list_filter = ('approved', 'start_date', 'end_date')
+    list_select_related = ('provider__user', 'customer__user')
+    list_filter = ('approved',)
+    date_hierarchy = 'start_date'
+    raw_id_fields = ('provider', 'customer')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Declared so the changelist shows a search box; lookups go through the search index.
     search_fields = ('provider__user__username', 'customer__user__username')
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(id__in=search_loans(search_term).values('id')), False
+
+class PaymentAdmin(admin.ModelAdmin):
+    list_display = ('id', 'loan', 'amount', 'date')
+    list_select_related = ('loan__provider__user', 'loan__customer__user')
+    date_hierarchy = 'date'
+    raw_id_fields = ('loan',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
 class LoanProviderAdmin(admin.ModelAdmin):
     list_display = ('user', 'available_funds')
     search_fields = ('user__username',)
@@ -26,6 +78,7 @@ class BankPersonnelAdmin(admin.ModelAdmin):
 
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(Loan, LoanAdmin)
+admin.site.register(Payment, PaymentAdmin)
 admin.site.register(LoanProvider, LoanProviderAdmin)
 admin.site.register(LoanCustomer, LoanCustomerAdmin)
 admin.site.register(BankPersonnel, BankPersonnelAdmin)
\ No newline at end of file
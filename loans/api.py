@@ -0,0 +1,64 @@
+from rest_framework import viewsets, generics
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated
+from .models import LoanProvider, LoanCustomer, BankPersonnel, Loan, Payment, LoanParameters
+from .serializers import LoanProviderSerializer, LoanCustomerSerializer, BankPersonnelSerializer, LoanSerializer, PaymentSerializer, LoanParametersSerializer
+from .permissions import IsLoanProvider, IsLoanCustomer, IsBankPersonnel
+from .search import search_loans
+
+class LoanProviderViewSet(viewsets.ModelViewSet):
+    queryset = LoanProvider.objects.all()
+    serializer_class = LoanProviderSerializer
+    permission_classes = [IsAuthenticated, IsLoanProvider]
+
+class LoanCustomerViewSet(viewsets.ModelViewSet):
+    queryset = LoanCustomer.objects.all()
+    serializer_class = LoanCustomerSerializer
+    permission_classes = [IsAuthenticated, IsLoanCustomer]
+
+class BankPersonnelViewSet(viewsets.ModelViewSet):
+    queryset = BankPersonnel.objects.all()
+    serializer_class = BankPersonnelSerializer
+    permission_classes = [IsAuthenticated, IsBankPersonnel]
+
+class LoanListView(generics.ListCreateAPIView):
+    queryset = Loan.objects.all()
+    serializer_class = LoanSerializer
+
+class LoanDetailView(generics.RetrieveUpdateDestroyAPIView):
+    queryset = Loan.objects.all()
+    serializer_class = LoanSerializer
+
+class PaymentListView(generics.ListCreateAPIView):
+    queryset = Payment.objects.all()
+    serializer_class = PaymentSerializer
+
+    def get_queryset(self):
+        # Archived payments of closed loans are only read when asked for.
+        if self.request.query_params.get('full_history') in ('1', 'true'):
+            return Payment.objects.full_history().order_by('date', 'id')
+        return super().get_queryset()
+
+class PaymentDetailView(generics.RetrieveUpdateDestroyAPIView):
+    queryset = Payment.objects.all()
+    serializer_class = PaymentSerializer
+
+class LoanParametersListView(generics.ListCreateAPIView):
+    queryset = LoanParameters.objects.all()
+    serializer_class = LoanParametersSerializer
+
+class LoanParametersDetailView(generics.RetrieveUpdateDestroyAPIView):
+    queryset = LoanParameters.objects.all()
+    serializer_class = LoanParametersSerializer
+
+class LoanSearchPagination(PageNumberPagination):
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class LoanSearchView(generics.ListAPIView):
+    serializer_class = LoanSerializer
+    pagination_class = LoanSearchPagination
+
+    def get_queryset(self):
+        return search_loans(self.request.query_params.get('q', '')).order_by('-id')
@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class ProfileModelBackend(ModelBackend):
+    """ModelBackend that resolves the session user and its role profile together.
+
+    The user is loaded with whichever of ``loanprovider``, ``loancustomer`` or
+    ``bankpersonnel`` exists in one joined query, so permission checks and
+    ``request.user.<profile>`` lookups cost nothing extra. Nothing is cached
+    across requests: ``is_active``, the role and the password hash behind the
+    session check are always read fresh.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related(
+                *UserModel.PROFILE_RELATIONS.values()
+            ).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,124 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+LOAN_APPROVED = 'loan.approved'
+PAYMENT_RECORDED = 'payment.recorded'
+
+
+class InProcessBroker:
+    """Fans events out to the subscribers living in this process.
+
+    Publishers may run in any thread (sync views, signals); each subscriber
+    queue is fed on the event loop that created it.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    async def listen(self, user_id, timeout=None):
+        """Yield events for ``user_id``, or ``None`` after ``timeout`` idle seconds."""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[user_id].add(subscriber)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), timeout)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers[user_id].discard(subscriber)
+                if not self._subscribers[user_id]:
+                    del self._subscribers[user_id]
+
+
+class CacheBroker:
+    """Pub/sub stand-in for multi-process setups sharing a Django cache.
+
+    Events are appended to a per-user log in the cache and subscribers poll
+    it, so every worker pointed at the same cache (file, memcached, redis)
+    sees every event.
+    """
+
+    key_prefix = 'loan-events'
+    event_ttl = 300
+
+    def __init__(self, poll_interval=0.5):
+        self.poll_interval = poll_interval
+
+    def _seq_key(self, user_id):
+        return f'{self.key_prefix}:{user_id}:seq'
+
+    def _event_key(self, user_id, seq):
+        return f'{self.key_prefix}:{user_id}:{seq}'
+
+    def publish(self, user_id, event):
+        cache.add(self._seq_key(user_id), 0, None)
+        seq = cache.incr(self._seq_key(user_id))
+        cache.set(self._event_key(user_id, seq), event, self.event_ttl)
+
+    async def listen(self, user_id, timeout=None):
+        last_seq = await cache.aget(self._seq_key(user_id), 0)
+        idle = 0
+        while True:
+            seq = await cache.aget(self._seq_key(user_id), 0)
+            if seq > last_seq:
+                events = await cache.aget_many(
+                    [self._event_key(user_id, n) for n in range(last_seq + 1, seq + 1)]
+                )
+                last_seq = seq
+                for event in events.values():
+                    yield event
+                idle = 0
+                continue
+            await asyncio.sleep(self.poll_interval)
+            idle += self.poll_interval
+            if timeout is not None and idle >= timeout:
+                idle = 0
+                yield None
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(getattr(settings, 'LOAN_EVENTS_BROKER', 'loans.events.InProcessBroker'))()
+
+
+def publish(user_ids, event_type, payload):
+    event = {'type': event_type, **payload}
+    broker = get_broker()
+    for user_id in set(user_ids):
+        broker.publish(user_id, event)
+
+
+def publish_loan_event(loan, event_type, payload):
+    """Notify the customer and provider of ``loan``."""
+    publish(
+        [loan.customer.user_id, loan.provider.user_id],
+        event_type,
+        {'loan': loan.id, **payload},
+    )
+
+
+_event_ids = itertools.count(1)
+
+
+def format_sse(event):
+    if event is None:
+        return ': keepalive\n\n'
+    return f"id: {next(_event_ids)}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,42 @@
+from django.urls import re_path
+from django.utils.module_loading import import_string
+
+
+class LazyAPIView:
+    """URL callback that imports a DRF view class on its first request.
+
+    ``initkwargs`` are passed to ``as_view()``; use ``actions=`` for viewsets.
+    DRF views are csrf_exempt at the Django level and enforce CSRF in their
+    own session authentication, so the wrapper is marked exempt up front.
+    """
+
+    csrf_exempt = True
+
+    def __init__(self, dotted_path, **initkwargs):
+        self.dotted_path = dotted_path
+        self.initkwargs = initkwargs
+        self.view = None
+
+    def __call__(self, request, *args, **kwargs):
+        if self.view is None:
+            self.view = import_string(self.dotted_path).as_view(**self.initkwargs)
+        return self.view(request, *args, **kwargs)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} {self.dotted_path}>'
+
+
+LIST_ACTIONS = {'get': 'list', 'post': 'create'}
+DETAIL_ACTIONS = {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+
+
+def viewset_urls(prefix, dotted_path, basename):
+    """The list and detail routes DefaultRouter would register for a ModelViewSet.
+
+    The patterns match the router's, so wrap the result in
+    ``format_suffix_patterns`` for its ``.json``/``.api`` variants.
+    """
+    return [
+        re_path(rf'^{prefix}/$', LazyAPIView(dotted_path, actions=LIST_ACTIONS), name=f'{basename}-list'),
+        re_path(rf'^{prefix}/(?P<pk>[^/.]+)/$', LazyAPIView(dotted_path, actions=DETAIL_ACTIONS), name=f'{basename}-detail'),
+    ]
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from loans.models import ArchivedPayment, Loan, Payment
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Command(BaseCommand):
+    help = "Move payments of fully repaid loans into the ArchivedPayment table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=365,
+                            help="Only archive loans whose last payment is older than this many days.")
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Payments moved per transaction.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report what would be archived without moving anything.")
+
+    def handle(self, *args, retention_days, chunk_size, dry_run, **options):
+        cutoff = timezone.now().date() - timedelta(days=retention_days)
+        loan_ids = list(
+            Loan.objects.fully_repaid().filter(last_payment__lt=cutoff).values_list('id', flat=True)
+        )
+        if dry_run:
+            count = Payment.objects.filter(loan_id__in=loan_ids).count()
+            self.stdout.write(f"Would archive {count} payments from {len(loan_ids)} loans.")
+            return
+
+        archived = 0
+        for loan_chunk in chunked(loan_ids, chunk_size):
+            while True:
+                with transaction.atomic():
+                    payments = list(
+                        Payment.objects.filter(loan_id__in=loan_chunk)
+                        .order_by('id')
+                        .values('id', 'loan_id', 'amount', 'date')[:chunk_size]
+                    )
+                    if not payments:
+                        break
+                    ArchivedPayment.objects.bulk_create(ArchivedPayment(**payment) for payment in payments)
+                    Payment.objects.filter(id__in=[payment['id'] for payment in payments]).delete()
+                archived += len(payments)
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} payments from {len(loan_ids)} loans."))
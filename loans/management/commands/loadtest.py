@@ -0,0 +1,297 @@
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, build_opener
+
+from django.core.management.base import BaseCommand, CommandError
+
+from loans.models import BankPersonnel, CustomUser, Loan, LoanCustomer, LoanProvider
+from loans.page_cache import LOAN_LIST, bump_versions
+from loans.search import index_loan
+
+USER_PREFIX = 'load-'
+PASSWORD = 'load-test-password'
+DEFAULT_MIX = 'login=1,apply=3,approve=1,pay=3,list=5'
+OPERATIONS = ('login', 'apply', 'approve', 'pay', 'list')
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        if name not in OPERATIONS:
+            raise CommandError(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}.")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Stats:
+    """Thread-safe latency and error bookkeeping, per reporting window and overall."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.window = []
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, operation, latency_ms, status):
+        with self.lock:
+            self.window.append((latency_ms, status))
+            self.latencies[operation].append(latency_ms)
+            self.statuses[operation][status] += 1
+
+    def reset(self):
+        with self.lock:
+            self.window = []
+            self.latencies.clear()
+            self.statuses.clear()
+
+    def take_window(self):
+        with self.lock:
+            window, self.window = self.window, []
+        return window
+
+
+def is_throttled(status):
+    return status == 429
+
+
+def is_error(status):
+    """Failed requests; 429s are counted separately as throttled."""
+    return not isinstance(status, int) or (status >= 400 and not is_throttled(status))
+
+
+class LoadClient:
+    """One simulated user: a loan customer session plus a bank personnel session."""
+
+    def __init__(self, base_url, customer, bank, loan_ids, stats):
+        self.base_url = base_url.rstrip('/')
+        self.customer = customer
+        self.bank = bank
+        self.loan_ids = loan_ids
+        self.stats = stats
+        self.customer_session = self.new_session()
+        self.bank_session = self.new_session()
+
+    @staticmethod
+    def new_session():
+        jar = CookieJar()
+        return build_opener(HTTPCookieProcessor(jar)), jar
+
+    def request(self, session, operation, path, data=None, record=True):
+        opener, _ = session
+        body = urlencode(data).encode() if data is not None else None
+        start = time.perf_counter()
+        try:
+            with opener.open(self.base_url + path, body, timeout=30) as response:
+                response.read()
+                status = response.status
+                url = response.url
+        except HTTPError as exc:
+            status, url = exc.code, None
+        except (URLError, OSError) as exc:
+            status, url = type(exc).__name__, None
+        if record:
+            self.stats.record(operation, (time.perf_counter() - start) * 1000, status)
+        return status, url
+
+    def login(self, session, username):
+        # Fetch the form first for the CSRF cookie, then post the credentials.
+        self.request(session, 'login', '/loans/login/', record=False)
+        csrf = next((cookie.value for cookie in session[1] if cookie.name == 'csrftoken'), '')
+        status, url = self.request(session, 'login', '/loans/login/', {
+            'username': username, 'password': PASSWORD, 'csrfmiddlewaretoken': csrf,
+        })
+        return status == 200 and url is not None and not url.endswith('/login/')
+
+    def run(self, operation):
+        if operation == 'login':
+            self.login(self.customer_session, self.customer)
+        elif operation == 'apply':
+            self.request(self.customer_session, operation, '/loans/apply-loan/', {
+                'amount': random.randint(1, 50) * 100, 'term': random.choice([6, 12, 24, 36]),
+            })
+        elif operation == 'approve':
+            self.request(self.bank_session, operation, f'/loans/approve-loan/{random.choice(self.loan_ids)}/')
+        elif operation == 'pay':
+            self.request(self.customer_session, operation, f'/loans/make-payment/{random.choice(self.loan_ids)}/', {
+                'amount': random.randint(1, 20) * 10, 'date': date.today().isoformat(),
+            })
+        elif operation == 'list':
+            self.request(self.customer_session, operation, '/loans/loans/')
+
+
+class Command(BaseCommand):
+    """Replays traffic from one machine, so every client shares one IP address.
+
+    The target server's per-IP limits (``LOANS_RATE_LIMITS``) then apply to
+    all clients together and answer most requests with 429 unless they are
+    raised on that server for the duration of the test. 429s are reported
+    in their own ``throttled`` column rather than as errors.
+    """
+
+    help = (
+        "Create load-test providers, customers and bank personnel, then replay a mix of "
+        "login, apply, approve, pay and list traffic against a running server. All clients "
+        "share one IP, so raise LOANS_RATE_LIMITS on the target or most requests get 429."
+    )
+
+    # Warn when more than this share of requests was throttled.
+    throttled_warning = 0.5
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--clients', type=int, default=10, help="Concurrent simulated users.")
+        parser.add_argument('--duration', type=float, default=30, help="Seconds of traffic to generate.")
+        parser.add_argument('--interval', type=float, default=5, help="Seconds between progress reports.")
+        parser.add_argument('--mix', default=DEFAULT_MIX, help="Weighted operations, e.g. %(default)s.")
+        parser.add_argument('--providers', type=int, default=5)
+        parser.add_argument('--loans', type=int, default=100, help="Loans seeded for approve and pay traffic.")
+        parser.add_argument('--think-time', type=float, default=0, help="Seconds each client waits between requests.")
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--cleanup', action='store_true', help="Delete load-test users and their loans, then exit.")
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            deleted, _ = CustomUser.objects.filter(username__startswith=USER_PREFIX).delete()
+            self.stdout.write(f"Deleted {deleted} load-test objects.")
+            return
+
+        random.seed(options['seed'])
+        weights = parse_mix(options['mix'])
+        customers, banks, loan_ids = self.create_fixtures(options['clients'], options['providers'], options['loans'])
+        if not loan_ids and ({'approve', 'pay'} & set(weights)):
+            raise CommandError("The approve and pay operations need --loans greater than 0.")
+        stats = Stats()
+        clients = [
+            LoadClient(options['base_url'], customer, bank, loan_ids, stats)
+            for customer, bank in zip(customers, banks)
+        ]
+        for client in clients:
+            if not (client.login(client.customer_session, client.customer) and client.login(client.bank_session, client.bank)):
+                raise CommandError(f"Could not log in as {client.customer} at {options['base_url']}.")
+        stats.reset()
+
+        deadline = time.monotonic() + options['duration']
+        threads = [
+            threading.Thread(target=self.drive, args=(client, weights, deadline, options['think_time']), daemon=True)
+            for client in clients
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        self.stdout.write(
+            f"{'elapsed':>8} {'reqs':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'throttled':>9}"
+        )
+        while any(thread.is_alive() for thread in threads):
+            window_start = time.monotonic()
+            for thread in threads:
+                thread.join(max(0, window_start + options['interval'] - time.monotonic()))
+            self.report_window(stats.take_window(), time.monotonic() - started, time.monotonic() - window_start)
+        self.report_summary(stats, time.monotonic() - started)
+
+    @staticmethod
+    def drive(client, weights, deadline, think_time):
+        operations, operation_weights = list(weights), list(weights.values())
+        while time.monotonic() < deadline:
+            client.run(random.choices(operations, operation_weights)[0])
+            if think_time:
+                time.sleep(think_time)
+
+    def create_fixtures(self, clients, providers, loans):
+        """Idempotently create the users and pending loans the traffic runs against."""
+        def user(username, role):
+            account, created = CustomUser.objects.get_or_create(username=username, defaults={'role': role})
+            if created:
+                account.set_password(PASSWORD)
+                account.save()
+            return account
+
+        provider_profiles = [
+            LoanProvider.objects.update_or_create(
+                user=user(f'{USER_PREFIX}provider-{n}', CustomUser.LOAN_PROVIDER),
+                defaults={'available_funds': 10_000_000},
+            )[0]
+            for n in range(providers)
+        ]
+        customer_profiles = [
+            LoanCustomer.objects.get_or_create(user=user(f'{USER_PREFIX}customer-{n}', CustomUser.LOAN_CUSTOMER))[0]
+            for n in range(clients)
+        ]
+        for n in range(clients):
+            BankPersonnel.objects.get_or_create(user=user(f'{USER_PREFIX}bank-{n}', CustomUser.BANK_PERSONNEL))
+
+        existing = Loan.objects.filter(customer__in=customer_profiles)
+        start = date.today()
+        created = Loan.objects.bulk_create(
+            Loan(
+                provider=random.choice(provider_profiles),
+                customer=random.choice(customer_profiles),
+                amount=random.randint(1, 50) * 100,
+                interest_rate=random.choice([3, 5, 7, 10]),
+                start_date=start,
+                end_date=start + timedelta(days=365),
+            )
+            for _ in range(max(0, loans - existing.count()))
+        )
+        if created:
+            # bulk_create skips the post_save signals that index loans and invalidate cached pages.
+            for loan in created:
+                index_loan(loan.pk)
+            bump_versions(LOAN_LIST)
+        return (
+            [f'{USER_PREFIX}customer-{n}' for n in range(clients)],
+            [f'{USER_PREFIX}bank-{n}' for n in range(clients)],
+            list(existing.values_list('id', flat=True)),
+        )
+
+    def report_window(self, window, elapsed, window_seconds):
+        latencies = sorted(latency for latency, _ in window)
+        errors = sum(1 for _, status in window if is_error(status))
+        throttled = sum(1 for _, status in window if is_throttled(status))
+        self.stdout.write(
+            f"{elapsed:8.1f} {len(window):6d} {len(window) / max(window_seconds, 1e-9):8.1f} "
+            f"{percentile(latencies, 0.5):8.1f} {percentile(latencies, 0.95):8.1f} {percentile(latencies, 0.99):8.1f} "
+            f"{(errors / len(window) if window else 0):7.1%} {(throttled / len(window) if window else 0):9.1%}"
+        )
+
+    def report_summary(self, stats, elapsed):
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'operation':<10} {'reqs':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'errors':>7} {'throttled':>9}  statuses"
+        )
+        total = total_throttled = 0
+        for operation in OPERATIONS:
+            latencies = sorted(stats.latencies.get(operation, ()))
+            if not latencies:
+                continue
+            total += len(latencies)
+            statuses = stats.statuses[operation]
+            errors = sum(count for status, count in statuses.items() if is_error(status))
+            throttled = sum(count for status, count in statuses.items() if is_throttled(status))
+            total_throttled += throttled
+            breakdown = ' '.join(f'{status}:{count}' for status, count in sorted(statuses.items(), key=str))
+            self.stdout.write(
+                f"{operation:<10} {len(latencies):6d} {len(latencies) / elapsed:8.1f} "
+                f"{percentile(latencies, 0.5):8.1f} {percentile(latencies, 0.95):8.1f} {percentile(latencies, 0.99):8.1f} "
+                f"{errors / len(latencies):7.1%} {throttled / len(latencies):9.1%}  {breakdown}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)."))
+        if total and total_throttled / total > self.throttled_warning:
+            self.stderr.write(self.style.WARNING(
+                f"{total_throttled / total:.0%} of requests were throttled (429), so the latencies above mostly "
+                "measure rejections. All clients share one IP: raise LOANS_RATE_LIMITS on the target server."
+            ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from loans.search import rebuild_index, uses_fts
+
+
+class Command(BaseCommand):
+    help = "Rebuild the loan search index from the loan and user tables, e.g. after a bulk import."
+
+    def handle(self, *args, **options):
+        if not uses_fts():
+            self.stdout.write("This database searches loans without an index; nothing to rebuild.")
+            return
+        indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} loans."))
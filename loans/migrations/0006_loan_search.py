@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:07
+
+from django.db import migrations, models
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE loans_loan_search USING fts5(provider, customer, tokenize='unicode61')"
+    )
+    schema_editor.execute("""
+        INSERT INTO loans_loan_search (rowid, provider, customer)
+        SELECT l.id, pu.username, cu.username
+        FROM loans_loan l
+        JOIN loans_loanprovider p ON p.id = l.provider_id
+        JOIN loans_customuser pu ON pu.id = p.user_id
+        JOIN loans_loancustomer c ON c.id = l.customer_id
+        JOIN loans_customuser cu ON cu.id = c.user_id
+    """)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE loans_loan_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0005_archivedpayment'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='loan',
+            name='amount',
+            field=models.DecimalField(db_index=True, decimal_places=2, max_digits=10),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
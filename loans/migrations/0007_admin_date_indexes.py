@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0006_loan_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='loan',
+            name='start_date',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='date',
+            field=models.DateField(db_index=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Max, Sum
 
 # Create your models here.
 
@@ -13,6 +14,12 @@ class CustomUser(AbstractUser):
         (LOAN_CUSTOMER, 'Loan Customer'),
         (BANK_PERSONNEL, 'Bank Personnel'),
     ]
+
+    PROFILE_RELATIONS = {
+        LOAN_PROVIDER: 'loanprovider',
+        LOAN_CUSTOMER: 'loancustomer',
+        BANK_PERSONNEL: 'bankpersonnel',
+    }
     
     role = models.CharField(max_length=2, choices=ROLE_CHOICES)
     
@@ -38,34 +45,88 @@ class BankPersonnel(models.Model):
     def __str__(self):
         return self.user.username
     
+class LoanQuerySet(models.QuerySet):
+    def fully_repaid(self):
+        """Loans whose hot payments cover principal plus interest.
+
+        Compared as ``paid * 100 >= amount * (100 + rate)``: SQLite stores
+        whole-number rates as integers, so ``rate / 100`` would truncate to 0.
+        The sum is annotated as ``hot_paid`` so it does not shadow
+        ``Loan.total_paid()``.
+        """
+        return self.annotate(
+            hot_paid=Sum('payment__amount'),
+            last_payment=Max('payment__date'),
+        ).alias(
+            paid_percent=F('hot_paid') * 100,
+            due_percent=F('amount') * (100 + F('interest_rate')),
+        ).filter(paid_percent__gte=F('due_percent'))
+
 class Loan(models.Model):
     provider = models.ForeignKey(LoanProvider, on_delete=models.CASCADE)
     customer = models.ForeignKey(LoanCustomer, on_delete=models.CASCADE)
-    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, db_index=True)
     interest_rate = models.DecimalField(max_digits=5, decimal_places=2)
-    start_date = models.DateField()
+    start_date = models.DateField(db_index=True)
     end_date = models.DateField()
     approved = models.BooleanField(default=False)
+
+    objects = LoanQuerySet.as_manager()
     
     def __str__(self):
         return f"Loan {self.id} from {self.provider} to {self.customer}"
+
+    def total_paid(self, full_history=False):
+        total = self.payment_set.aggregate(total=Sum('amount'))['total'] or 0
+        if full_history:
+            total += self.archivedpayment_set.aggregate(total=Sum('amount'))['total'] or 0
+        return total
     
     def approve(self):
         if self.amount <= self.provider.available_funds:
             self.approved = True
             self.provider.available_funds -= self.amount
-            self.save()
-            self.provider.save()
+            # The loan and the provider's funds change together or not at all,
+            # whatever the save signals (search index, page cache) run into.
+            with transaction.atomic():
+                self.save()
+                self.provider.save()
+            # robust: a broker outage must not fail an approval that already committed.
+            transaction.on_commit(self._publish_approved, robust=True)
             return True
         return False
 
+    def _publish_approved(self):
+        from .events import LOAN_APPROVED, publish_loan_event
+        publish_loan_event(self, LOAN_APPROVED, {'approved': True})
+
+class PaymentManager(models.Manager):
+    def full_history(self, **filters):
+        """Hot and archived payments matching ``filters``, as ``Payment`` instances."""
+        archived = ArchivedPayment.objects.filter(**filters).only('id', 'loan', 'amount', 'date')
+        return self.filter(**filters).union(archived, all=True)
+
 class Payment(models.Model):
     loan = models.ForeignKey(Loan, on_delete=models.CASCADE)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
-    date = models.DateField()
+    date = models.DateField(db_index=True)
+
+    objects = PaymentManager()
     
     def __str__(self):
-        return f"Payment {self.id} for Loan {self.loan.id}"
+        return f"Payment {self.id} for Loan {self.loan_id}"
+
+class ArchivedPayment(models.Model):
+    # Keeps the original Payment id, and the same column order as Payment so
+    # both tables can be UNIONed by Payment.objects.full_history().
+    id = models.BigIntegerField(primary_key=True)
+    loan = models.ForeignKey(Loan, on_delete=models.CASCADE)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    date = models.DateField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived payment {self.id} for Loan {self.loan_id}"
 
 class LoanParameters(models.Model):
     min_amount = models.DecimalField(max_digits=10, decimal_places=2)
@@ -0,0 +1,68 @@
+import logging
+import uuid
+import zlib
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import render
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_TIMEOUT = 600
+
+LOAN_LIST = 'loan-list'
+USERS = 'users'
+
+
+def loan_scope(loan_id):
+    return f'loan:{loan_id}'
+
+
+def _version_key(scope):
+    return f'loans:version:{scope}'
+
+
+def get_versions(scopes):
+    """Current version token of each scope, minting tokens for unseen scopes.
+
+    Tokens are random rather than counters so an evicted version can never
+    line up with a stale page still sitting in the cache.
+    """
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*scopes):
+    """Invalidate every page built from ``scopes``.
+
+    Called from model signals in the middle of money writes, so a cache
+    outage is logged rather than raised; pages then go stale for at most
+    ``PAGE_CACHE_TIMEOUT`` seconds.
+    """
+    try:
+        cache.set_many({_version_key(scope): uuid.uuid4().hex for scope in scopes}, None)
+    except Exception:
+        logger.exception("Could not bump page cache versions %s", scopes)
+
+
+def cached_render(request, template_name, get_context, scopes=(), variant=''):
+    """Render ``template_name`` or serve it from the zlib-compressed page cache.
+
+    The cache key carries the version of every scope the page depends on, so
+    bumping a scope (see ``loans.signals``) invalidates every page built from it.
+    Versions live in the default cache, which must be shared by all workers
+    (see ``CACHES`` in settings) for a save in one to reach the others.
+    ``get_context`` is only called on a miss.
+    """
+    key = ':'.join(['loans:page', template_name, variant, *get_versions(scopes)])
+    compressed = cache.get(key)
+    if compressed is not None:
+        return HttpResponse(zlib.decompress(compressed))
+    response = render(request, template_name, get_context())
+    cache.set(key, zlib.compress(response.content), PAGE_CACHE_TIMEOUT)
+    return response
@@ -0,0 +1,105 @@
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Loan
+
+# SQLite FTS5 table holding provider and customer usernames, rowid = loan id.
+# It is created by migration 0006 and kept in sync by loans.signals; writes
+# that skip signals (bulk_create, raw SQL) need `manage.py rebuild_search_index`.
+FTS_TABLE = 'loans_loan_search'
+
+AMOUNT_RE = re.compile(r'^\d+(\.\d{1,2})?$')
+
+_INDEX_SQL = f"""
+    INSERT INTO {FTS_TABLE} (rowid, provider, customer)
+    SELECT l.id, pu.username, cu.username
+    FROM loans_loan l
+    JOIN loans_loanprovider p ON p.id = l.provider_id
+    JOIN loans_customuser pu ON pu.id = p.user_id
+    JOIN loans_loancustomer c ON c.id = l.customer_id
+    JOIN loans_customuser cu ON cu.id = c.user_id
+"""
+
+
+def uses_fts():
+    return connection.vendor == 'sqlite'
+
+
+def index_loan(loan_id):
+    if not uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [loan_id])
+        cursor.execute(_INDEX_SQL + ' WHERE l.id = %s', [loan_id])
+
+
+def unindex_loan(loan_id):
+    if not uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [loan_id])
+
+
+def reindex_user(user_id):
+    """Refresh every loan where ``user_id`` is the provider or the customer, in two statements."""
+    if not uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            DELETE FROM {FTS_TABLE} WHERE rowid IN (
+                SELECT l.id FROM loans_loan l
+                JOIN loans_loanprovider p ON p.id = l.provider_id
+                JOIN loans_loancustomer c ON c.id = l.customer_id
+                WHERE p.user_id = %s OR c.user_id = %s
+            )
+        """, [user_id, user_id])
+        cursor.execute(_INDEX_SQL + ' WHERE pu.id = %s OR cu.id = %s', [user_id, user_id])
+
+
+def rebuild_index():
+    """Rebuild the whole index from the loan tables; returns the number of loans indexed."""
+    if not uses_fts():
+        return 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(_INDEX_SQL)
+        return cursor.rowcount
+
+
+def _match_expression(words):
+    # Each word becomes a quoted prefix query; FTS5 ANDs them together.
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def search_loans(query):
+    """Loans matching every term of ``query``.
+
+    Numeric terms match the (indexed) loan amount exactly. Other terms are
+    prefix matches on the words of the provider or customer username: FTS5
+    splits usernames on punctuation, so ``bank`` finds ``acme.bank``. Backends
+    without FTS5 only match the start of the whole username.
+    """
+    terms = query.split()
+    if not terms:
+        return Loan.objects.none()
+    loans = Loan.objects.all()
+    words = []
+    for term in terms:
+        if AMOUNT_RE.match(term):
+            loans = loans.filter(amount=term)
+        else:
+            words.append(term)
+    if not words:
+        return loans
+    if uses_fts():
+        return loans.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [_match_expression(words)]
+        ))
+    for word in words:
+        loans = loans.filter(
+            Q(provider__user__username__istartswith=word) | Q(customer__user__username__istartswith=word)
+        )
+    return loans
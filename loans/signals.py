@@ -0,0 +1,53 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .events import PAYMENT_RECORDED, publish_loan_event
+from .models import CustomUser, Loan, Payment
+from .page_cache import LOAN_LIST, USERS, bump_versions, loan_scope
+from .search import index_loan, reindex_user, unindex_loan
+
+
+@receiver(post_save, sender=Payment)
+def publish_payment_recorded(sender, instance, created, **kwargs):
+    if not created:
+        return
+    transaction.on_commit(lambda: publish_loan_event(instance.loan, PAYMENT_RECORDED, {
+        'payment': instance.id,
+        'amount': str(instance.amount),
+        'date': str(instance.date),
+    }), robust=True)
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_user_pages(sender, instance, created=False, update_fields=None, **kwargs):
+    # A new user has no loans on any cached page yet, and logins only touch
+    # last_login, which no cached page shows.
+    if not created and (update_fields is None or 'username' in update_fields):
+        bump_versions(USERS)
+
+
+@receiver([post_save, post_delete], sender=Loan)
+def invalidate_loan_pages(sender, instance, **kwargs):
+    bump_versions(LOAN_LIST, loan_scope(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Payment)
+def invalidate_loan_payment_pages(sender, instance, **kwargs):
+    bump_versions(loan_scope(instance.loan_id))
+
+
+@receiver(post_save, sender=CustomUser)
+def reindex_user_loans(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (update_fields is None or 'username' in update_fields):
+        reindex_user(instance.pk)
+
+
+@receiver(post_save, sender=Loan)
+def index_loan_for_search(sender, instance, **kwargs):
+    index_loan(instance.pk)
+
+
+@receiver(post_delete, sender=Loan)
+def unindex_loan_for_search(sender, instance, **kwargs):
+    unindex_loan(instance.pk)
@@ -1,7 +1,26 @@
-from django.test import TestCase
-from django.urls import reverse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from datetime import date, timedelta
+from django.core.management import call_command
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.conf import settings
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve, reverse
 from rest_framework.test import APIClient
-from .models import LoanProvider, LoanCustomer, Loan, CustomUser, LoanParameters
+from .events import InProcessBroker, LOAN_APPROVED, PAYMENT_RECORDED, get_broker
+from .search import reindex_user, search_loans
+from .checks import check_shared_cache
+from .throttling import FixedWindowCounter, LoadSheddingMiddleware, client_ip, load_monitor
+from .models import LoanProvider, LoanCustomer, BankPersonnel, Loan, CustomUser, LoanParameters, Payment, ArchivedPayment
 
 class LoanApprovalTest(TestCase):
     def setUp(self):
@@ -50,6 +69,15 @@ class LoanEndpointsTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json()['status'], 'parameters defined')
 
+    def test_api_routes_match_default_router(self):
+        self.assertEqual(resolve('/loans/api/loan-providers.json').url_name, 'loanprovider-list')
+        match = resolve(f'/loans/api/loan-providers/{self.provider.id}.json')
+        self.assertEqual((match.url_name, match.kwargs), ('loanprovider-detail', {'pk': str(self.provider.id), 'format': 'json'}))
+        self.assertEqual(resolve('/loans/api/.json').url_name, 'api-root')
+        response = self.client.get('/loans/api/bank-personnel.json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
     def test_apply_for_loan(self):
         self.client.login(username='customer', password='password')
         response = self.client.post(reverse('apply_loan'), {
@@ -126,3 +154,522 @@ class UnauthorizedAccessTest(TestCase):
             'min_amount': 100, 'max_amount': 10000, 'min_interest_rate': 1, 'max_interest_rate': 10, 'min_duration': 6, 'max_duration': 60
         })
         self.assertEqual(response.status_code, 403)
+
+class LoanEventsTest(TestCase):
+    def setUp(self):
+        self.provider_user = CustomUser.objects.create_user(username='provider', password='password', role=CustomUser.LOAN_PROVIDER)
+        self.customer_user = CustomUser.objects.create_user(username='customer', password='password', role=CustomUser.LOAN_CUSTOMER)
+        self.provider = LoanProvider.objects.create(user=self.provider_user, available_funds=1000.00)
+        self.customer = LoanCustomer.objects.create(user=self.customer_user)
+        self.loan = Loan.objects.create(provider=self.provider, customer=self.customer, amount=500.00, interest_rate=5.00, start_date='2025-01-01', end_date='2026-01-01')
+        self.events = []
+        patcher = mock.patch.object(get_broker(), 'publish', lambda user_id, event: self.events.append((user_id, event)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_approve_publishes_to_customer_and_provider(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loan.approve()
+        self.assertEqual(
+            sorted(user_id for user_id, _ in self.events),
+            sorted([self.customer_user.id, self.provider_user.id]),
+        )
+        self.assertEqual(self.events[0][1], {'type': LOAN_APPROVED, 'loan': self.loan.id, 'approved': True})
+
+    def test_publish_failure_does_not_fail_approval(self):
+        with mock.patch.object(get_broker(), 'publish', side_effect=ConnectionError('broker down')), \
+                self.assertLogs('django.test', 'ERROR'), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(self.loan.approve())
+        self.loan.refresh_from_db()
+        self.assertTrue(self.loan.approved)
+
+    def test_failed_approval_publishes_nothing(self):
+        self.loan.amount = 1500.00
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loan.approve()
+        self.assertEqual(self.events, [])
+
+    def test_payment_publishes_event(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            payment = Payment.objects.create(loan=self.loan, amount=100.00, date='2025-06-01')
+        self.assertEqual(len(self.events), 2)
+        self.assertEqual(self.events[0][1]['type'], PAYMENT_RECORDED)
+        self.assertEqual(self.events[0][1]['payment'], payment.id)
+
+    def test_events_need_asgi(self):
+        self.client.force_login(self.customer_user)
+        response = self.client.get(reverse('loan_events'))
+        self.assertEqual(response.status_code, 501)
+
+    async def test_events_require_login(self):
+        response = await self.async_client.get(reverse('loan_events'))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_events_stream_under_asgi(self):
+        await self.async_client.aforce_login(self.customer_user)
+        response = await self.async_client.get(reverse('loan_events'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        await response.streaming_content.aclose()
+
+
+class InProcessBrokerTest(TestCase):
+    def test_subscriber_receives_published_event(self):
+        async def scenario():
+            broker = InProcessBroker()
+            stream = broker.listen(1, timeout=1)
+            pending = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0)
+            broker.publish(2, {'type': 'other'})
+            broker.publish(1, {'type': LOAN_APPROVED})
+            event = await pending
+            await stream.aclose()
+            return event, broker._subscribers
+
+        event, subscribers = asyncio.run(scenario())
+        self.assertEqual(event, {'type': LOAN_APPROVED})
+        self.assertEqual(dict(subscribers), {})
+
+
+class UserProfileLookupTest(TestCase):
+    def setUp(self):
+        self.customer_user = CustomUser.objects.create_user(username='customer', password='password', role=CustomUser.LOAN_CUSTOMER)
+        self.customer = LoanCustomer.objects.create(user=self.customer_user)
+        self.client = APIClient()
+        self.client.login(username='customer', password='password')
+
+    def test_user_and_profile_load_in_one_query(self):
+        # The session row, then the user joined with its LoanCustomer.
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12})
+        self.assertEqual(response.status_code, 200)
+
+    def test_changes_apply_on_the_next_request(self):
+        self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12})
+        self.customer.delete()
+        response = self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12})
+        self.assertEqual(response.status_code, 403)
+        self.customer_user.is_active = False
+        self.customer_user.save()
+        response = self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12})
+        self.assertEqual(response.status_code, 403)
+
+
+class RateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.customer_user = CustomUser.objects.create_user(username='customer', password='password', role=CustomUser.LOAN_CUSTOMER)
+        LoanCustomer.objects.create(user=self.customer_user)
+        self.client = APIClient()
+        self.client.login(username='customer', password='password')
+
+    @override_settings(LOANS_RATE_LIMITS={'apply_loan': '2/min'})
+    def test_apply_for_loan_is_throttled(self):
+        with mock.patch('loans.throttling.time.time', return_value=1000.0):
+            for _ in range(2):
+                response = self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12})
+                self.assertEqual(response.status_code, 200)
+            response = self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12})
+        self.assertEqual(response.status_code, 429)
+        # The one-minute window holding t=1000 resets at t=1020.
+        self.assertEqual(response['Retry-After'], '20')
+
+    def test_parallel_requests_cannot_overdraw(self):
+        counter = FixedWindowCounter(5, 60)
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            waits = list(pool.map(lambda _: counter.consume('loans:test', now=1000.0), range(50)))
+        self.assertEqual(waits.count(0), 5)
+
+    @override_settings(LOANS_RATE_LIMITS={'api_write': '1/min'})
+    def test_api_writes_are_throttled_reads_are_not(self):
+        self.client.post(reverse('loan_parameters_list'), {})
+        response = self.client.post(reverse('loan_parameters_list'), {})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.client.get(reverse('loan_parameters_list')).status_code, 200)
+
+    @override_settings(LOANS_CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR', LOANS_NUM_PROXIES=1)
+    def test_client_ip_comes_from_trusted_proxy_header(self):
+        request = mock.Mock(META={'REMOTE_ADDR': '10.0.0.1', 'HTTP_X_FORWARDED_FOR': '6.6.6.6, 203.0.113.7'})
+        self.assertEqual(client_ip(request), '203.0.113.7')
+        request = mock.Mock(META={'REMOTE_ADDR': '10.0.0.1'})
+        self.assertEqual(client_ip(request), '10.0.0.1')
+
+    @override_settings(LOANS_RATE_LIMITS={'apply_loan': '1/min'}, LOANS_CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_clients_behind_a_proxy_have_separate_limits(self):
+        self.client.logout()
+        for address in ('203.0.113.7', '203.0.113.8'):
+            response = self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12}, HTTP_X_FORWARDED_FOR=address)
+            self.assertNotEqual(response.status_code, 429)
+        response = self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12}, HTTP_X_FORWARDED_FOR='203.0.113.7')
+        self.assertEqual(response.status_code, 429)
+
+
+class LoadSheddingTest(TestCase):
+    def setUp(self):
+        self.customer_user = CustomUser.objects.create_user(username='customer', password='password', role=CustomUser.LOAN_CUSTOMER)
+        self.provider_user = CustomUser.objects.create_user(username='provider', password='password', role=CustomUser.LOAN_PROVIDER)
+        customer = LoanCustomer.objects.create(user=self.customer_user)
+        provider = LoanProvider.objects.create(user=self.provider_user, available_funds=1000.00)
+        self.loan = Loan.objects.create(provider=provider, customer=customer, amount=500.00, interest_rate=5.00, start_date='2025-01-01', end_date='2026-01-01')
+        self.client = APIClient()
+        self.client.login(username='customer', password='password')
+        cache.clear()
+        load_monitor.samples.clear()
+        self.addCleanup(load_monitor.samples.clear)
+
+    @override_settings(LOANS_LOAD_SHEDDING={'MAX_IN_FLIGHT': 0})
+    def test_overload_sheds_everything_but_approvals(self):
+        response = self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+        response = self.client.get(reverse('approve_loan', args=[self.loan.id]))
+        self.assertEqual(response.json()['status'], 'approved')
+
+    def test_slow_database_sheds_load(self):
+        for _ in range(20):
+            load_monitor.record_request(1300)
+        response = self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12})
+        self.assertEqual(response.status_code, 429)
+
+    def test_single_slow_request_does_not_shed(self):
+        load_monitor.record_request(1300)
+        for _ in range(20):
+            response = self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12})
+            self.assertEqual(response.status_code, 200)
+
+    def test_slow_samples_age_out(self):
+        long_ago = time.monotonic() - 60
+        for _ in range(20):
+            load_monitor.record_request(1300, now=long_ago)
+        response = self.client.post(reverse('apply_loan'), {'amount': 500.00, 'term': 12})
+        self.assertEqual(response.status_code, 200)
+
+    def test_middleware_stays_async_under_asgi(self):
+        async def get_response(request):
+            pass
+        self.assertTrue(asyncio.iscoroutinefunction(LoadSheddingMiddleware(get_response)))
+        self.assertFalse(asyncio.iscoroutinefunction(LoadSheddingMiddleware(lambda request: None)))
+
+    @override_settings(LOANS_LOAD_SHEDDING={'MAX_IN_FLIGHT': 0})
+    async def test_overload_sheds_async_requests(self):
+        response = await self.async_client.get(reverse('loan_list'))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(load_monitor.in_flight, 0)
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    def test_process_local_cache_warns_on_deploy(self):
+        self.assertEqual([message.id for message in check_shared_cache(None)], ['loans.W001'])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost'}})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        provider_user = CustomUser.objects.create_user(username='provider', password='password', role=CustomUser.LOAN_PROVIDER)
+        customer_user = CustomUser.objects.create_user(username='customer', password='password', role=CustomUser.LOAN_CUSTOMER)
+        self.provider = LoanProvider.objects.create(user=provider_user, available_funds=1000.00)
+        self.customer = LoanCustomer.objects.create(user=customer_user)
+        self.loan = Loan.objects.create(provider=self.provider, customer=self.customer, amount=500.00, interest_rate=5.00, start_date='2025-01-01', end_date='2026-01-01')
+
+    def test_loan_list_served_from_cache(self):
+        first = self.client.get(reverse('loan_list_view'))
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('loan_list_view'))
+        self.assertEqual(first.content, second.content)
+
+    def test_loan_save_invalidates_list_and_detail(self):
+        self.client.get(reverse('loan_list_view'))
+        self.client.get(reverse('loan_detail_view', args=[self.loan.id]))
+        self.loan.amount = 750.00
+        self.loan.save()
+        self.assertContains(self.client.get(reverse('loan_list_view')), '750.0')
+        self.assertContains(self.client.get(reverse('loan_detail_view', args=[self.loan.id])), 'Amount: 750.0')
+
+    def test_payment_invalidates_detail(self):
+        self.client.get(reverse('loan_detail_view', args=[self.loan.id]))
+        Payment.objects.create(loan=self.loan, amount=100.00, date='2025-06-01')
+        with self.assertNumQueries(1):
+            self.client.get(reverse('loan_detail_view', args=[self.loan.id]))
+
+    def test_cache_outage_does_not_fail_approval(self):
+        with mock.patch('loans.page_cache.cache.set_many', side_effect=ConnectionError('cache down')), \
+                self.assertLogs('loans.page_cache', 'ERROR'):
+            self.assertTrue(self.loan.approve())
+        self.provider.refresh_from_db()
+        self.assertEqual(self.provider.available_funds, 500)
+
+    def test_approval_is_atomic(self):
+        with mock.patch.object(LoanProvider, 'save', side_effect=RuntimeError('write failed')):
+            with self.assertRaises(RuntimeError):
+                self.loan.approve()
+        self.loan.refresh_from_db()
+        self.assertFalse(self.loan.approved)
+
+    def test_new_user_does_not_invalidate_pages(self):
+        with mock.patch('loans.signals.bump_versions') as bump:
+            CustomUser.objects.create_user(username='newcomer', password=None, role=CustomUser.LOAN_CUSTOMER)
+        bump.assert_not_called()
+
+    def test_missing_loan_is_not_cached(self):
+        self.assertEqual(self.client.get(reverse('loan_detail_view', args=[999])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('loan_detail_view', args=[999])).status_code, 404)
+
+
+class PaymentArchiveTest(TestCase):
+    def setUp(self):
+        provider_user = CustomUser.objects.create_user(username='provider', password='password', role=CustomUser.LOAN_PROVIDER)
+        customer_user = CustomUser.objects.create_user(username='customer', password='password', role=CustomUser.LOAN_CUSTOMER)
+        provider = LoanProvider.objects.create(user=provider_user, available_funds=1000.00)
+        customer = LoanCustomer.objects.create(user=customer_user)
+        old = date.today() - timedelta(days=400)
+        self.repaid = Loan.objects.create(provider=provider, customer=customer, amount=100.00, interest_rate=10.00, start_date='2023-01-01', end_date='2024-01-01')
+        self.open = Loan.objects.create(provider=provider, customer=customer, amount=500.00, interest_rate=5.00, start_date='2023-01-01', end_date='2026-01-01')
+        for _ in range(3):
+            Payment.objects.create(loan=self.repaid, amount=40.00, date=old)
+        Payment.objects.create(loan=self.open, amount=40.00, date=old)
+
+    def test_archives_only_fully_repaid_loans(self):
+        call_command('archive_payments', retention_days=365, chunk_size=2, stdout=StringIO())
+        self.assertFalse(Payment.objects.filter(loan=self.repaid).exists())
+        self.assertEqual(ArchivedPayment.objects.filter(loan=self.repaid).count(), 3)
+        self.assertEqual(Payment.objects.filter(loan=self.open).count(), 1)
+
+    def test_partly_paid_interest_is_not_archived(self):
+        # 101 paid of the 110 owed on 100 at a whole-number 10% rate.
+        Payment.objects.filter(loan=self.repaid).delete()
+        Payment.objects.create(loan=self.repaid, amount=101.00, date=date.today() - timedelta(days=400))
+        self.assertNotIn(self.repaid, Loan.objects.fully_repaid())
+        call_command('archive_payments', retention_days=365, stdout=StringIO())
+        self.assertEqual(ArchivedPayment.objects.count(), 0)
+        Payment.objects.create(loan=self.repaid, amount=9.00, date=date.today() - timedelta(days=400))
+        self.assertIn(self.repaid, Loan.objects.fully_repaid())
+
+    def test_fully_repaid_rows_keep_total_paid_method(self):
+        loan = Loan.objects.fully_repaid().get(pk=self.repaid.pk)
+        self.assertEqual(loan.hot_paid, 120)
+        self.assertEqual(loan.total_paid(full_history=True), 120)
+
+    def test_retention_window_keeps_recent_loans(self):
+        call_command('archive_payments', retention_days=500, stdout=StringIO())
+        self.assertEqual(ArchivedPayment.objects.count(), 0)
+
+    def test_full_history_includes_archive(self):
+        ids = sorted(Payment.objects.values_list('id', flat=True))
+        call_command('archive_payments', stdout=StringIO())
+        self.assertEqual(Payment.objects.count(), 1)
+        self.assertEqual(sorted(payment.id for payment in Payment.objects.full_history()), ids)
+        self.assertEqual(self.repaid.total_paid(), 0)
+        self.assertEqual(self.repaid.total_paid(full_history=True), 120)
+
+        client = APIClient()
+        self.assertEqual(len(client.get(reverse('payment_list')).json()), 1)
+        self.assertEqual(len(client.get(reverse('payment_list'), {'full_history': 'true'}).json()), 4)
+
+
+STARTUP_SCRIPT = """
+import json, os, sys, time
+os.environ['DJANGO_SETTINGS_MODULE'] = 'finloans.settings'
+start = time.perf_counter()
+import django
+django.setup()
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import Client
+import loans.urls
+WSGIHandler()
+booted = time.perf_counter()
+modules = sorted(name for name in sys.modules if name.startswith(('loans', 'rest_framework')))
+status = Client(HTTP_HOST='localhost').get('/loans/').status_code
+done = time.perf_counter()
+print(json.dumps({
+    'modules': modules,
+    'status': status,
+    'startup_ms': (booted - start) * 1000,
+    'first_request_ms': (done - booted) * 1000,
+}))
+"""
+
+
+class StartupBenchmarkTest(SimpleTestCase):
+    """Cold start of a worker process, budgets overridable from the environment."""
+
+    startup_budget_ms = float(os.environ.get('LOANS_STARTUP_BUDGET_MS', 1500))
+    first_request_budget_ms = float(os.environ.get('LOANS_FIRST_REQUEST_BUDGET_MS', 500))
+    urlconf_budget_us = int(os.environ.get('LOANS_URLCONF_IMPORT_BUDGET_US', 50_000))
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+        cls.report = json.loads(result.stdout.splitlines()[-1])
+        # -X importtime lines: "import time: <self us> | <cumulative us> | <module>"
+        cls.import_times = {}
+        for line in result.stderr.splitlines():
+            if line.startswith('import time:') and not line.endswith('imported package'):
+                _, cumulative, module = line.split('|')
+                if cumulative.strip().isdigit():
+                    cls.import_times[module.strip()] = int(cumulative)
+
+    def test_drf_views_are_not_imported_at_startup(self):
+        for module in ('loans.api', 'loans.serializers', 'rest_framework.views', 'rest_framework.serializers'):
+            self.assertNotIn(module, self.report['modules'])
+
+    def test_urlconf_import_time(self):
+        self.assertLess(self.import_times['loans.urls'], self.urlconf_budget_us)
+
+    def test_cold_start_and_first_request(self):
+        self.assertEqual(self.report['status'], 200)
+        self.assertLess(self.report['startup_ms'], self.startup_budget_ms)
+        self.assertLess(self.report['first_request_ms'], self.first_request_budget_ms)
+
+
+class LoanSearchTest(TestCase):
+    def setUp(self):
+        self.provider_user = CustomUser.objects.create_user(username='acme.bank', password='password', role=CustomUser.LOAN_PROVIDER)
+        self.customer_user = CustomUser.objects.create_user(username='alice', password='password', role=CustomUser.LOAN_CUSTOMER)
+        other_user = CustomUser.objects.create_user(username='bob', password='password', role=CustomUser.LOAN_CUSTOMER)
+        provider = LoanProvider.objects.create(user=self.provider_user, available_funds=1000.00)
+        customer = LoanCustomer.objects.create(user=self.customer_user)
+        other = LoanCustomer.objects.create(user=other_user)
+        self.alice_loan = Loan.objects.create(provider=provider, customer=customer, amount=500.00, interest_rate=5.00, start_date='2025-01-01', end_date='2026-01-01')
+        self.bob_loan = Loan.objects.create(provider=provider, customer=other, amount=750.00, interest_rate=5.00, start_date='2025-01-01', end_date='2026-01-01')
+
+    def test_search_by_username_prefix_and_amount(self):
+        self.assertEqual(list(search_loans('ali')), [self.alice_loan])
+        self.assertEqual(set(search_loans('acme')), {self.alice_loan, self.bob_loan})
+        self.assertEqual(list(search_loans('acme 750')), [self.bob_loan])
+        self.assertEqual(list(search_loans('carol')), [])
+        self.assertEqual(list(search_loans('"')), [])
+        self.assertEqual(set(search_loans('bank')), {self.alice_loan, self.bob_loan})
+
+    def test_rename_reindexes_in_two_statements(self):
+        self.provider_user.username = 'acme.lending'
+        with CaptureQueriesContext(connection) as queries:
+            reindex_user(self.provider_user.id)
+        self.assertEqual(len(queries), 2)
+        self.provider_user.save()
+        self.assertEqual(set(search_loans('lending')), {self.alice_loan, self.bob_loan})
+        self.assertEqual(list(search_loans('bank')), [])
+
+    def test_index_follows_renames_and_deletes(self):
+        self.customer_user.username = 'alicia'
+        self.customer_user.save()
+        self.assertEqual(list(search_loans('alicia')), [self.alice_loan])
+        self.bob_loan.delete()
+        self.assertEqual(list(search_loans('bob')), [])
+
+    def test_rebuild_command_restores_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM loans_loan_search')
+        self.assertEqual(list(search_loans('alice')), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 2 loans.', out.getvalue())
+        self.assertEqual(list(search_loans('alice')), [self.alice_loan])
+
+    def test_search_api_is_paginated(self):
+        response = APIClient().get(reverse('loan_search'), {'q': 'acme', 'page_size': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual([loan['id'] for loan in response.json()['results']], [self.bob_loan.id])
+
+    def test_admin_changelist_uses_index(self):
+        admin_user = CustomUser.objects.create_superuser(username='admin', password='password', role=CustomUser.BANK_PERSONNEL)
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse('admin:loans_loan_changelist'), {'q': 'bob'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.bob_loan])
+
+
+class AdminChangelistTest(TestCase):
+    def setUp(self):
+        admin_user = CustomUser.objects.create_superuser(username='admin', password=None, role=CustomUser.BANK_PERSONNEL)
+        self.client.force_login(admin_user)
+        self.loan_count = 0
+
+    def add_loans(self, count):
+        # Unusable passwords skip hashing, which would dominate the test's runtime.
+        for _ in range(count):
+            self.loan_count += 1
+            provider_user = CustomUser.objects.create_user(username=f'provider{self.loan_count}', password=None, role=CustomUser.LOAN_PROVIDER)
+            customer_user = CustomUser.objects.create_user(username=f'customer{self.loan_count}', password=None, role=CustomUser.LOAN_CUSTOMER)
+            provider = LoanProvider.objects.create(user=provider_user, available_funds=1000.00)
+            customer = LoanCustomer.objects.create(user=customer_user)
+            loan = Loan.objects.create(provider=provider, customer=customer, amount=500.00, interest_rate=5.00, start_date='2025-01-01', end_date='2026-01-01')
+            Payment.objects.create(loan=loan, amount=100.00, date='2025-06-01')
+
+    def changelist_queries(self, url_name):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        for url_name in ('admin:loans_loan_changelist', 'admin:loans_payment_changelist'):
+            self.add_loans(2)
+            few = self.changelist_queries(url_name)
+            self.add_loans(5)
+            self.assertEqual(self.changelist_queries(url_name), few)
+
+    @override_settings(LOANS_ADMIN_COUNT_THRESHOLD=1)
+    def test_large_table_uses_estimated_count(self):
+        self.add_loans(3)
+        with mock.patch('loans.admin.estimate_row_count', return_value=5000):
+            response = self.client.get(reverse('admin:loans_loan_changelist'))
+            self.assertEqual(response.context['cl'].result_count, 5000)
+            response = self.client.get(reverse('admin:loans_loan_changelist'), {'approved__exact': '0'})
+            self.assertEqual(response.context['cl'].result_count, 3)
+
+    @override_settings(LOANS_ADMIN_COUNT_THRESHOLD=1)
+    def test_sqlite_counts_exactly_after_deletes(self):
+        self.add_loans(3)
+        Payment.objects.filter(id__in=Payment.objects.order_by('id').values('id')[:2]).delete()
+        response = self.client.get(reverse('admin:loans_payment_changelist'))
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+
+class LoadTestCommandTest(LiveServerTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    # The target server must have its per-IP limits raised: every client shares one IP.
+    @override_settings(LOANS_RATE_LIMITS={'apply_loan': '10000/min', 'make_payment': '10000/min', 'approve_loan': '10000/min'})
+    def test_replays_traffic_and_reports(self):
+        out, err = StringIO(), StringIO()
+        call_command(
+            'loadtest', base_url=self.live_server_url, clients=2, duration=1, interval=0.5,
+            providers=1, loans=3, seed=1, stdout=out, stderr=err,
+        )
+        report = out.getvalue()
+        self.assertIn('p95 ms', report)
+        self.assertIn('throttled', report)
+        self.assertIn('requests in', report)
+        self.assertEqual(err.getvalue(), '')
+        self.assertEqual(LoanCustomer.objects.filter(user__username__startswith='load-').count(), 2)
+        self.assertEqual(BankPersonnel.objects.filter(user__username__startswith='load-').count(), 2)
+        self.assertEqual(Loan.objects.count(), 3)
+        self.assertEqual(search_loans('load').count(), 3)
+
+        call_command('loadtest', cleanup=True, stdout=StringIO())
+        self.assertFalse(CustomUser.objects.filter(username__startswith='load-').exists())
+
+    @override_settings(LOANS_RATE_LIMITS={'apply_loan': '1/min'})
+    def test_throttled_requests_are_reported_apart_from_errors(self):
+        out, err = StringIO(), StringIO()
+        call_command(
+            'loadtest', base_url=self.live_server_url, clients=2, duration=1, interval=5,
+            mix='apply=1', providers=1, loans=0, seed=1, stdout=out, stderr=err,
+        )
+        summary = next(line for line in out.getvalue().splitlines() if line.startswith('apply '))
+        self.assertIn('   0.0%', summary)
+        self.assertIn('429:', summary)
+        self.assertIn('raise LOANS_RATE_LIMITS', err.getvalue())
@@ -0,0 +1,264 @@
+import math
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from rest_framework.throttling import BaseThrottle
+
+DEFAULT_RATE_LIMITS = {
+    'apply_loan': '30/min',
+    'make_payment': '30/min',
+    'approve_loan': '60/min',
+    'api_write': '120/min',
+}
+
+DEFAULT_LOAD_SHEDDING = {
+    'MAX_IN_FLIGHT': 64,
+    'MAX_DB_LATENCY_MS': 250,
+    'LATENCY_PERCENTILE': 0.9,
+    'LATENCY_WINDOW': 10,
+    'MIN_SAMPLES': 20,
+    'RETRY_AFTER': 1,
+    'EXEMPT': ['approve_loan'],
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Turn ``'10/min'`` into ``(10, 60)``: the request limit and window length in seconds."""
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+def get_rate(scope):
+    rates = {**DEFAULT_RATE_LIMITS, **getattr(settings, 'LOANS_RATE_LIMITS', {})}
+    return rates.get(scope)
+
+
+class FixedWindowCounter:
+    """Allows ``capacity`` requests per key in each ``period``-second window.
+
+    Counting uses ``cache.add`` and ``cache.incr``, which are atomic on the
+    local-memory, Redis and Memcached backends, so parallel requests cannot
+    overdraw the limit. A client can still send up to ``2 * capacity``
+    requests across a window boundary.
+    """
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.period = period
+
+    def consume(self, key, now=None):
+        """Count a request against ``key``; return 0 if allowed or the seconds until the window resets."""
+        now = time.time() if now is None else now
+        window = int(now // self.period)
+        window_key = f'{key}:{window}'
+        cache.add(window_key, 0, self.period + 1)
+        try:
+            count = cache.incr(window_key)
+        except ValueError:
+            # The key expired between add() and incr().
+            cache.add(window_key, 1, self.period + 1)
+            count = 1
+        if count > self.capacity:
+            return (window + 1) * self.period - now
+        return 0
+
+
+def client_ip(request):
+    """The client address, read from ``LOANS_CLIENT_IP_HEADER`` behind a trusted proxy.
+
+    With a header such as ``HTTP_X_FORWARDED_FOR`` configured, the entry added
+    by the outermost of ``LOANS_NUM_PROXIES`` trusted proxies is used; entries
+    further left are client-supplied and could be spoofed.
+    """
+    header = getattr(settings, 'LOANS_CLIENT_IP_HEADER', None)
+    if header and request.META.get(header):
+        addresses = [address.strip() for address in request.META[header].split(',')]
+        num_proxies = getattr(settings, 'LOANS_NUM_PROXIES', 1)
+        return addresses[-min(num_proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR')
+
+
+def limit_keys(scope, request):
+    keys = [f'loans:throttle:{scope}:ip:{client_ip(request)}']
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        keys.append(f'loans:throttle:{scope}:user:{user.pk}')
+    return keys
+
+
+def check_rate(scope, request):
+    """Count the request against the per-IP and per-user limits of ``scope``; return the wait in seconds."""
+    rate = get_rate(scope)
+    if rate is None:
+        return 0
+    counter = FixedWindowCounter(*parse_rate(rate))
+    return max(counter.consume(key) for key in limit_keys(scope, request))
+
+
+def too_many_requests(wait):
+    response = HttpResponse("Too many requests.", status=429)
+    response['Retry-After'] = str(max(1, math.ceil(wait)))
+    return response
+
+
+def rate_limit(scope):
+    """Throttle a plain Django view with the limits configured for ``scope``."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            wait = check_rate(scope, request)
+            if wait:
+                return too_many_requests(wait)
+            return view_func(request, *args, **kwargs)
+        return wrapped
+    return decorator
+
+
+class RateLimitThrottle(BaseThrottle):
+    """DRF throttle sharing the counters used by ``rate_limit``.
+
+    Only unsafe methods are throttled. Views pick a scope with
+    ``throttle_scope``, defaulting to ``api_write``.
+    """
+
+    def allow_request(self, request, view):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return True
+        self.wait_time = check_rate(getattr(view, 'throttle_scope', 'api_write'), request)
+        return not self.wait_time
+
+    def wait(self):
+        return self.wait_time
+
+
+class LoadMonitor:
+    """Tracks in-flight requests and recent per-request DB time for this process.
+
+    Each request that ran queries contributes one sample: its total time in
+    the database. The process counts as overloaded when a percentile of the
+    samples from the last ``LATENCY_WINDOW`` seconds exceeds the threshold.
+    Old samples age out, so a burst of slow requests stops shedding on its
+    own even when shed requests add no new samples.
+    """
+
+    max_samples = 1000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.samples = deque(maxlen=self.max_samples)
+
+    def record_request(self, db_time_ms, now=None):
+        with self.lock:
+            self.samples.append((time.monotonic() if now is None else now, db_time_ms))
+
+    def db_latency_ms(self, config, now=None):
+        """The configured percentile of recent samples, or None with too few samples."""
+        cutoff = (time.monotonic() if now is None else now) - config['LATENCY_WINDOW']
+        with self.lock:
+            while self.samples and self.samples[0][0] < cutoff:
+                self.samples.popleft()
+            recent = sorted(duration for _, duration in self.samples)
+        if len(recent) < config['MIN_SAMPLES']:
+            return None
+        return recent[min(len(recent) - 1, int(config['LATENCY_PERCENTILE'] * len(recent)))]
+
+    def overloaded(self, config):
+        if self.in_flight > config['MAX_IN_FLIGHT']:
+            return True
+        latency = self.db_latency_ms(config)
+        return latency is not None and latency > config['MAX_DB_LATENCY_MS']
+
+
+load_monitor = LoadMonitor()
+
+
+class LoadSheddingMiddleware:
+    """Rejects requests with 429 while the process is overloaded.
+
+    URL names listed in ``EXEMPT`` (the approval path by default) are always
+    served so they keep their latency budget while everything else backs off.
+
+    ``MAX_IN_FLIGHT`` counts requests running in this process. Under ASGI
+    that includes requests waiting on the database; under a threaded WSGI
+    server it can never exceed the thread count, so requests queued for a
+    thread go unseen and only the DB latency signal applies there.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        shed = self.enter(request)
+        if shed is not None:
+            return shed
+        timer = QueryTimer()
+        try:
+            with connection.execute_wrapper(timer):
+                return self.get_response(request)
+        finally:
+            self.exit(timer)
+
+    async def __acall__(self, request):
+        shed = self.enter(request)
+        if shed is not None:
+            return shed
+        timer = QueryTimer()
+        try:
+            with connection.execute_wrapper(timer):
+                return await self.get_response(request)
+        finally:
+            self.exit(timer)
+
+    def enter(self, request):
+        """Count the request in, or return the 429 to send instead."""
+        config = {**DEFAULT_LOAD_SHEDDING, **getattr(settings, 'LOANS_LOAD_SHEDDING', {})}
+        try:
+            exempt = resolve(request.path_info).url_name in config['EXEMPT']
+        except Resolver404:
+            exempt = False
+        with load_monitor.lock:
+            load_monitor.in_flight += 1
+        if not exempt and load_monitor.overloaded(config):
+            self.exit()
+            return too_many_requests(config['RETRY_AFTER'])
+        return None
+
+    def exit(self, timer=None):
+        with load_monitor.lock:
+            load_monitor.in_flight -= 1
+        if timer is not None and timer.queries:
+            load_monitor.record_request(timer.total_ms)
+
+
+class QueryTimer:
+    """``execute_wrapper`` that sums the DB time of one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.total_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.total_ms += (time.monotonic() - start) * 1000
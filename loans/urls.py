@@ -1,22 +1,29 @@
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
-from .views import approve_loan_request, LoanProviderViewSet, LoanCustomerViewSet, BankPersonnelViewSet, apply_for_loan, make_loan_payment, define_loan_parameters, view_amortization_table
-from django.views.generic import RedirectView
-from .views import LoanListView, LoanDetailView, PaymentListView, PaymentDetailView, LoanParametersListView, LoanParametersDetailView
+from rest_framework.urlpatterns import format_suffix_patterns
+from .views import approve_loan_request, apply_for_loan, make_loan_payment, define_loan_parameters, view_amortization_table
 from .views import loan_application_view, loan_payment_view, loan_parameters_view
 from .views import loan_list_view, loan_detail_view
 from .views import home_view
 from .views import login_view, logout_view
+from .views import loan_events_view
+from .lazy import LazyAPIView, viewset_urls
 
-router = DefaultRouter()
-router.register(r'loan-providers', LoanProviderViewSet)
-router.register(r'loan-customers', LoanCustomerViewSet)
-router.register(r'bank-personnel', BankPersonnelViewSet)
+# DRF views are resolved on first request; see loans.lazy.
+api_urlpatterns = format_suffix_patterns([
+    path('', LazyAPIView('rest_framework.routers.APIRootView', api_root_dict={
+        'loan-providers': 'loanprovider-list',
+        'loan-customers': 'loancustomer-list',
+        'bank-personnel': 'bankpersonnel-list',
+    }), name='api-root'),
+    *viewset_urls('loan-providers', 'loans.api.LoanProviderViewSet', 'loanprovider'),
+    *viewset_urls('loan-customers', 'loans.api.LoanCustomerViewSet', 'loancustomer'),
+    *viewset_urls('bank-personnel', 'loans.api.BankPersonnelViewSet', 'bankpersonnel'),
+])
 
 urlpatterns = [
     path('', home_view, name='home'),
     path('approve-loan/<int:loan_id>/', approve_loan_request, name='approve_loan'),
-    path('api/', include(router.urls)),
+    path('api/', include(api_urlpatterns)),
 ]
 
 urlpatterns += [
@@ -24,12 +31,13 @@ urlpatterns += [
     path('make-payment/<int:loan_id>/', make_loan_payment, name='make_payment'),
     path('define-loan-parameters/', define_loan_parameters, name='define_loan_parameters'),
     path('view-amortization/<int:provider_id>/', view_amortization_table, name='view_amortization'),
-    path('loans/', LoanListView.as_view(), name='loan_list'),
-    path('loans/<int:pk>/', LoanDetailView.as_view(), name='loan_detail'),
-    path('payments/', PaymentListView.as_view(), name='payment_list'),
-    path('payments/<int:pk>/', PaymentDetailView.as_view(), name='payment_detail'),
-    path('loan-parameters/', LoanParametersListView.as_view(), name='loan_parameters_list'),
-    path('loan-parameters/<int:pk>/', LoanParametersDetailView.as_view(), name='loan_parameters_detail'),
+    path('loans/', LazyAPIView('loans.api.LoanListView'), name='loan_list'),
+    path('loans/search/', LazyAPIView('loans.api.LoanSearchView'), name='loan_search'),
+    path('loans/<int:pk>/', LazyAPIView('loans.api.LoanDetailView'), name='loan_detail'),
+    path('payments/', LazyAPIView('loans.api.PaymentListView'), name='payment_list'),
+    path('payments/<int:pk>/', LazyAPIView('loans.api.PaymentDetailView'), name='payment_detail'),
+    path('loan-parameters/', LazyAPIView('loans.api.LoanParametersListView'), name='loan_parameters_list'),
+    path('loan-parameters/<int:pk>/', LazyAPIView('loans.api.LoanParametersDetailView'), name='loan_parameters_detail'),
 ]
 
 urlpatterns += [
@@ -47,3 +55,7 @@ urlpatterns += [
     path('login/', login_view, name='login'),
     path('logout/', logout_view, name='logout'),
 ]
+
+urlpatterns += [
+    path('events/', loan_events_view, name='loan_events'),
+]
@@ -1,22 +1,25 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponseForbidden
-from .models import Loan, CustomUser, Payment, LoanParameters
-from rest_framework import viewsets, generics
-from .models import LoanProvider, LoanCustomer, BankPersonnel
-from .serializers import LoanProviderSerializer, LoanCustomerSerializer, BankPersonnelSerializer, LoanSerializer, PaymentSerializer, LoanParametersSerializer
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from .models import Loan, CustomUser
+from .models import LoanProvider, LoanCustomer
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.dateparse import parse_date
 from django.core.exceptions import PermissionDenied
-from rest_framework.permissions import IsAuthenticated
-from .permissions import IsLoanProvider, IsLoanCustomer, IsBankPersonnel
 from django.contrib.auth import authenticate, login, logout
+from .events import get_broker, format_sse
+from .throttling import rate_limit
+from .page_cache import cached_render, loan_scope, LOAN_LIST, USERS
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Create your views here.
+# DRF views live in loans.api and are imported by the URLconf on first use,
+# keeping rest_framework's views and serializers out of worker start-up.
 
+@rate_limit('approve_loan')
 def approve_loan_request(request, loan_id):
     loan = get_object_or_404(Loan, id=loan_id)
     if loan.approve():
@@ -26,6 +29,7 @@ def approve_loan_request(request, loan_id):
 
 @require_POST
 @csrf_exempt
+@rate_limit('apply_loan')
 def apply_for_loan(request):
     if not request.user.is_authenticated:
         return HttpResponseForbidden("You must be logged in to apply for a loan.")
@@ -46,6 +50,7 @@ def apply_for_loan(request):
 
 @require_POST
 @csrf_exempt
+@rate_limit('make_payment')
 def make_loan_payment(request, loan_id):
     if not request.user.is_authenticated or request.user.role != CustomUser.LOAN_CUSTOMER:
         raise PermissionDenied
@@ -61,6 +66,7 @@ def define_loan_parameters(request):
         return HttpResponseForbidden("You must be logged in to define loan parameters.")
     if request.user.role != CustomUser.BANK_PERSONNEL:
         return HttpResponseForbidden("Only bank personnel can define loan parameters.")
+    from .serializers import LoanParametersSerializer
     serializer = LoanParametersSerializer(data=request.POST)
     if serializer.is_valid():
         serializer.save()
@@ -84,15 +90,18 @@ def loan_parameters_view(request):
     return render(request, 'loans/define_loan_parameters.html')
 
 def loan_list_view(request):
-    loans = Loan.objects.all()
-    return render(request, 'loans/loan_list.html', {'loans': loans})
+    return cached_render(request, 'loans/loan_list.html', lambda: {
+        'loans': Loan.objects.select_related('customer__user'),
+    }, scopes=[LOAN_LIST, USERS])
 
 def loan_detail_view(request, loan_id):
-    loan = get_object_or_404(Loan, id=loan_id)
-    return render(request, 'loans/loan_detail.html', {'loan': loan})
+    return cached_render(request, 'loans/loan_detail.html', lambda: {
+        'loan': get_object_or_404(Loan.objects.select_related('provider__user', 'customer__user'), id=loan_id),
+    }, scopes=[loan_scope(loan_id), USERS], variant=str(loan_id))
 
 def home_view(request):
-    return render(request, 'loans/home.html')
+    authenticated = request.user.is_authenticated
+    return cached_render(request, 'loans/home.html', dict, variant='user' if authenticated else 'anonymous')
 
 def login_view(request):
     if request.method == 'POST':
@@ -110,41 +119,22 @@ def logout_view(request):
     logout(request)
     return redirect('home')
 
-class LoanProviderViewSet(viewsets.ModelViewSet):
-    queryset = LoanProvider.objects.all()
-    serializer_class = LoanProviderSerializer
-    permission_classes = [IsAuthenticated, IsLoanProvider]
-
-class LoanCustomerViewSet(viewsets.ModelViewSet):
-    queryset = LoanCustomer.objects.all()
-    serializer_class = LoanCustomerSerializer
-    permission_classes = [IsAuthenticated, IsLoanCustomer]
-
-class BankPersonnelViewSet(viewsets.ModelViewSet):
-    queryset = BankPersonnel.objects.all()
-    serializer_class = BankPersonnelSerializer
-    permission_classes = [IsAuthenticated, IsBankPersonnel]
-
-class LoanListView(generics.ListCreateAPIView):
-    queryset = Loan.objects.all()
-    serializer_class = LoanSerializer
-
-class LoanDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Loan.objects.all()
-    serializer_class = LoanSerializer
-
-class PaymentListView(generics.ListCreateAPIView):
-    queryset = Payment.objects.all()
-    serializer_class = PaymentSerializer
-
-class PaymentDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Payment.objects.all()
-    serializer_class = PaymentSerializer
-
-class LoanParametersListView(generics.ListCreateAPIView):
-    queryset = LoanParameters.objects.all()
-    serializer_class = LoanParametersSerializer
-
-class LoanParametersDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = LoanParameters.objects.all()
-    serializer_class = LoanParametersSerializer
+SSE_KEEPALIVE = 15
+
+async def loan_events_view(request):
+    # WSGI buffers async streams until they end, which this one never does and
+    # would pin a worker thread; serve it from an ASGI server (see finloans.asgi).
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse("Loan events require the ASGI application.", status=501)
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponseForbidden("You must be logged in to receive loan events.")
+
+    async def stream():
+        async for event in get_broker().listen(user.id, timeout=SSE_KEEPALIVE):
+            yield format_sse(event)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response